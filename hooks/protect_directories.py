@@ -42,9 +42,10 @@ import os
 import re
 import shlex
 import sys
+import traceback
 import warnings
 from pathlib import Path
-from typing import Optional, cast
+from typing import NoReturn, Optional, cast
 
 # Regex special characters that need escaping
 REGEX_SPECIAL_CHARS = ".^$[](){}+|\\"
@@ -53,6 +54,14 @@ MARKER_FILE_NAME = ".block"
 LOCAL_MARKER_FILE_NAME = ".block.local"
 
 
+class _Blocked(Exception):
+    """Raised with the block decision once an operation is found to be protected."""
+
+    def __init__(self, decision: dict):
+        super().__init__(decision["reason"])
+        self.decision = decision
+
+
 def _create_empty_config(  # noqa: PLR0913
     allowed: Optional[list] = None,
     blocked: Optional[list] = None,
@@ -1059,7 +1068,7 @@ def test_is_marker_file(file_path: str) -> bool:
     return filename in (MARKER_FILE_NAME, LOCAL_MARKER_FILE_NAME)
 
 
-def block_marker_removal(target_file: str) -> None:
+def block_marker_removal(target_file: str) -> NoReturn:
     """Block marker file removal."""
     filename = os.path.basename(target_file)
     message = f"""BLOCKED: Cannot modify {filename}
@@ -1071,11 +1080,10 @@ This is a safety mechanism to ensure directory protection remains in effect.
 
 To remove protection, manually delete the file using your file manager or terminal."""
 
-    print(json.dumps({"decision": "block", "reason": message}))
-    sys.exit(0)
+    raise _Blocked({"decision": "block", "reason": message})
 
 
-def block_config_error(marker_path: str, error_message: str) -> None:
+def block_config_error(marker_path: str, error_message: str) -> NoReturn:
     """Block config error."""
     message = f"""BLOCKED: Invalid {MARKER_FILE_NAME} configuration
 
@@ -1087,19 +1095,17 @@ Please fix the configuration file. Valid formats:
   - {{ "allowed": ["pattern"] }} = only allow matching paths
   - {{ "blocked": ["pattern"] }} = only block matching paths"""
 
-    print(json.dumps({"decision": "block", "reason": message}))
-    sys.exit(0)
+    raise _Blocked({"decision": "block", "reason": message})
 
 
-def block_with_message(target_file: str, marker_path: str, reason: str, guide: str) -> None:
+def block_with_message(target_file: str, marker_path: str, reason: str, guide: str) -> NoReturn:
     """Block with message."""
     if guide:
         message = guide
     else:
         message = f"BLOCKED by .block: {marker_path}"
 
-    print(json.dumps({"decision": "block", "reason": message}))
-    sys.exit(0)
+    raise _Blocked({"decision": "block", "reason": message})
 
 
 def test_should_block(file_path: str, protection_info: dict) -> dict:
@@ -1195,10 +1201,11 @@ def test_should_block(file_path: str, protection_info: dict) -> dict:
     }
 
 
-def main():
-    """Main entry point."""
-    hook_input = sys.stdin.read()
+def _check_hook_input(hook_input: str, data: Optional[dict] = None) -> None:
+    """Check a single hook input, raising _Blocked if the operation is protected.
 
+    data is hook_input already parsed, for callers that needed to parse it first.
+    """
     quick_path = extract_path_without_json(hook_input)
 
     if quick_path:
@@ -1207,16 +1214,17 @@ def main():
             quick_dir = os.path.join(os.getcwd(), quick_dir)
 
         if not has_block_file_in_hierarchy(quick_dir):
-            sys.exit(0)
+            return
 
-    try:
-        data = json.loads(hook_input)
-    except json.JSONDecodeError:
-        sys.exit(0)
+    if data is None:
+        try:
+            data = json.loads(hook_input)
+        except json.JSONDecodeError:
+            return
 
     tool_name = data.get("tool_name", "")
     if not tool_name:
-        sys.exit(0)
+        return
 
     tool_input = data.get("tool_input", {})
     paths_to_check = []
@@ -1234,7 +1242,7 @@ def main():
         if command:
             paths_to_check.extend(get_bash_target_paths(command))
     else:
-        sys.exit(0)
+        return
 
     # Lazy agent resolution: resolved once when first needed, cached for all paths
     agent_state = {"resolved": False, "type": None}
@@ -1289,8 +1297,61 @@ def main():
                         "Child directory is protected", guide,
                     )
 
+
+def evaluate(hook_input: str, data: Optional[dict] = None) -> Optional[dict]:
+    """Evaluate a single hook input and return the block decision, or None to allow.
+
+    data is hook_input already parsed, for callers that needed to parse it first.
+    """
+    try:
+        _check_hook_input(hook_input, data)
+    except _Blocked as blocked:
+        return blocked.decision
+    return None
+
+
+def main():
+    """Main entry point."""
+    decision = evaluate(sys.stdin.read())
+    if decision:
+        print(json.dumps(decision))
     sys.exit(0)
 
 
+def run_batch() -> None:
+    """Batch entry point: evaluate one hook input per line of stdin.
+
+    Writes exactly one line per request: the block decision JSON, or an empty
+    line when the operation is allowed. Each request runs from the directory in
+    its "cwd" field, or from the batch process's starting directory if it has
+    none. A request that cannot be set up (invalid JSON, not an object, a
+    missing cwd) is allowed, failing open like the single-shot hook. If
+    evaluating a request raises, the traceback goes to stderr and the response
+    is an {"error": ...} line, so a hook bug is never reported as an allow.
+    Lets callers such as the test suite reuse one interpreter instead of paying
+    startup per invocation.
+    """
+    start_cwd = os.getcwd()
+    for line in sys.stdin:
+        try:
+            data = json.loads(line)
+            os.chdir(data.get("cwd") or start_cwd)
+        except (ValueError, AttributeError, OSError):
+            response = ""
+        else:
+            try:
+                decision = evaluate(line, data)
+            except Exception as e:
+                traceback.print_exc()
+                response = json.dumps({"error": f"{type(e).__name__}: {e}"})
+            else:
+                response = json.dumps(decision) if decision else ""
+        sys.stdout.write(response + "\n")
+        sys.stdout.flush()
+
+
 if __name__ == "__main__":
-    main()
+    if "--batch" in sys.argv[1:]:
+        run_batch()
+    else:
+        main()
@@ -9,7 +9,7 @@ set "HOOK_DIR=%~dp0"
 REM Call Python to evaluate protection rules
 where python >nul 2>&1
 if %errorlevel% equ 0 (
-    python "%HOOK_DIR%protect_directories.py"
+    python "%HOOK_DIR%protect_directories.py" %*
     exit /b !errorlevel!
 )
 
@@ -22,11 +22,11 @@ HOOK_DIR="$(cd "$(dirname "$0")" && pwd)"
 
 # Call Python to evaluate protection rules
 if command -v python3 >/dev/null 2>&1; then
-    python3 "$HOOK_DIR/protect_directories.py"
+    python3 "$HOOK_DIR/protect_directories.py" "$@"
     exit $?
 fi
 if command -v python >/dev/null 2>&1; then
-    python "$HOOK_DIR/protect_directories.py"
+    python "$HOOK_DIR/protect_directories.py" "$@"
     exit $?
 fi
 
@@ -1,37 +1,55 @@
 """Integration tests for the protect_directories.py hook."""
 
+import importlib.util
+import io
+import json
+import os
+import stat
 import subprocess
 import sys
 from pathlib import Path
 
+import pytest
+
+from tests.conftest import make_bash_input, make_edit_input, make_write_input
+
 # Get the hooks directory as absolute path
 HOOKS_DIR = (Path(__file__).parent.parent / "hooks").resolve()
 PROTECT_SCRIPT = HOOKS_DIR / "protect_directories.py"
 RUN_HOOK_CMD = HOOKS_DIR / "run-hook.cmd"
 
+# Precomputed once so the subprocess helpers don't re-stringify paths per call
+_IS_WINDOWS = os.name == "nt"
+_HOOK_CMD_ARGV_WIN = [str(RUN_HOOK_CMD)]
+# run-hook.cmd is a cmd/sh polyglot with no shebang, so exec'ing it directly fails
+# with ENOEXEC; only a shell falls back to interpreting it. "exec" makes /bin/sh
+# replace itself with the script instead of forking again, and still requires +x.
+_HOOK_CMD_SHELL = f'exec "{RUN_HOOK_CMD}"'
 
-def to_posix_path(path) -> str:
-    """Convert path to forward slashes for JSON compatibility."""
-    return str(path).replace("\\", "/")
+# Mode of run-hook.cmd, stat'ed once for the executable-permission checks
+_EXEC_MODE = os.stat(RUN_HOOK_CMD).st_mode
 
+# Import the hook via importlib to avoid polluting sys.path
+# (adding hooks/ to sys.path causes pytest to collect test_* functions
+# from protect_directories.py)
+_spec = importlib.util.spec_from_file_location("protect_directories", str(PROTECT_SCRIPT))
+assert _spec is not None and _spec.loader is not None, "Failed to load protect_directories.py"
+_pd = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_pd)
 
-def run_hook(input_json: str, cwd: str = None) -> tuple[str, int]:
-    """Run the hook with given JSON input and return (output, exit_code).
 
-    This calls Python directly (fast, but doesn't test the real execution path).
-    Use run_hook_cmd() to test the actual Claude Code execution path.
+def to_posix_path(path) -> str:
+    """Convert path to forward slashes for use inside a Bash command string.
+
+    Only needed on Windows, where backslashes would be taken as escapes when
+    the command is split. Everywhere else the path is returned unchanged.
     """
-    result = subprocess.run(
-        [sys.executable, str(PROTECT_SCRIPT)],
-        input=input_json,
-        capture_output=True,
-        text=True,
-        cwd=cwd,
-    )
-    return result.stdout + result.stderr, result.returncode
+    if _IS_WINDOWS:
+        return os.fspath(path).replace("\\", "/")
+    return os.fspath(path)
 
 
-def run_hook_cmd(input_json: str, cwd: str = None) -> tuple[str, int]:
+def run_hook_cmd(input_json: str, cwd: str = None) -> tuple[bytes, int]:
     """Run the hook via run-hook.cmd (matches Claude Code's real execution path).
 
     This tests the actual polyglot script execution, including:
@@ -42,98 +60,276 @@ def run_hook_cmd(input_json: str, cwd: str = None) -> tuple[str, int]:
 
     On Unix/Mac, the script must have execute permissions to run directly.
     This matches how Claude Code executes hooks and would catch permission bugs.
+    Output is returned as raw bytes with stderr merged into stdout.
     """
-    import os
-
     # Detect platform and use appropriate execution method
-    if os.name == 'nt':  # Windows
+    if _IS_WINDOWS:
         # On Windows, .cmd files are executable by file association
-        result = subprocess.run(
-            [str(RUN_HOOK_CMD)],
-            input=input_json,
-            capture_output=True,
-            text=True,
-            cwd=cwd,
-        )
+        args, shell = _HOOK_CMD_ARGV_WIN, False
     else:  # Unix/Mac
         # On Unix, run via shell which executes the script directly
         # This requires +x permission (the bug we're testing for!)
-        result = subprocess.run(
-            f'"{RUN_HOOK_CMD}"',
-            input=input_json,
-            capture_output=True,
-            text=True,
-            cwd=cwd,
-            shell=True,
-        )
-    return result.stdout + result.stderr, result.returncode
+        # A direct argv exec can't be used: the script has no shebang
+        args, shell = _HOOK_CMD_SHELL, True
 
+    result = subprocess.run(
+        args,
+        input=input_json.encode(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        cwd=cwd,
+        shell=shell,
+        # Python creates fds non-inheritable, so the test process has none the
+        # child must not see and the post-fork fd-closing pass is wasted work.
+        # Passing cwd rules out posix_spawn, so this still uses fork/exec.
+        close_fds=False,
+    )
+    return result.stdout, result.returncode
 
-class TestHookIntegration:
-    """Test the protect_directories.py hook directly."""
 
-    def test_blocks_when_block_file_exists(self, tmp_path):
-        """Hook should block when .block file exists in directory."""
-        (tmp_path / ".block").write_text("{}")
-        file_path = to_posix_path(tmp_path / "test.txt")
+@pytest.fixture(scope="class")
+def persistent_hook_cmd():
+    """Run one run-hook.cmd --batch child shared by every test in the class.
 
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, _ = run_hook(input_json, cwd=str(tmp_path))
+    Requests and responses are newline-delimited JSON, so the cmd/sh and
+    Python startup is paid once per class instead of once per case. The hook
+    always exits 0, which is checked when the class is torn down. Only used on
+    Unix, so it always goes via the shell like run_hook_cmd(), which requires +x.
+    """
+    with subprocess.Popen(
+        f"{_HOOK_CMD_SHELL} --batch",
+        shell=True,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        bufsize=-1,
+        # As in run_hook_cmd(), no fds need closing in the child. With no cwd and
+        # an absolute /bin/sh, this lets Popen start the child via posix_spawn.
+        close_fds=False,
+    ) as proc:
+        yield proc
+        proc.stdin.close()
+        assert proc.wait() == 0, f"run-hook.cmd --batch exited with {proc.returncode}"
+
+
+def send_hook_cmd(proc: subprocess.Popen, request: bytes) -> bytes:
+    """Send one encoded request line to a --batch hook process and return its response.
+
+    The pipes are binary: the request goes out in a single buffered write and
+    the response line comes back as raw bytes. An error response, sent when the
+    hook raised while evaluating the request, fails the calling test.
+    """
+    proc.stdin.write(request)
+    proc.stdin.flush()
+    response = proc.stdout.readline()
+    assert response, "Hook batch process exited unexpectedly"
+    assert not response.startswith(b'{"error"'), f"Hook raised: {response.decode()}"
+    return response
 
-        assert "block" in output.lower(), f"Expected block decision, got: {output}"
 
-    def test_allows_when_no_block_file(self, tmp_path):
-        """Hook should allow (no output) when no .block file exists."""
-        file_path = to_posix_path(tmp_path / "test.txt")
+# Batch request lines with a fixed outer structure; only the JSON string leaves
+# (tool input, then cwd) are filled in per request
+_EDIT_REQUEST = b'{"tool_name": "Edit", "tool_input": {"file_path": %s}, "cwd": %s}\n'
+_BASH_REQUEST = b'{"tool_name": "Bash", "tool_input": {"command": %s}, "cwd": %s}\n'
 
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, exit_code = run_hook(input_json, cwd=str(tmp_path))
 
-        assert exit_code == 0, f"Expected exit 0, got {exit_code}"
-        assert "block" not in output.lower(), f"Expected allow (no block), got: {output}"
+def _json_string(value: str) -> bytes:
+    """Encode value as a JSON string literal, escaping quotes and backslashes."""
+    return json.dumps(value).encode()
+
+
+def edit_request(file_path: Path, cwd: Path) -> bytes:
+    """Create a batch request line for an Edit of file_path run from cwd."""
+    return _EDIT_REQUEST % (_json_string(os.fspath(file_path)), _json_string(os.fspath(cwd)))
+
+
+def bash_redirect_request(file_path: Path, cwd: Path) -> bytes:
+    """Create a batch request line for a Bash redirect to file_path run from cwd."""
+    command = f"echo test > {to_posix_path(file_path)}"
+    return _BASH_REQUEST % (_json_string(command), _json_string(os.fspath(cwd)))
 
-    def test_detects_block_in_parent_directory(self, tmp_path):
-        """Hook should detect .block file in parent directory."""
-        parent = tmp_path / "parent"
-        child = parent / "child"
-        child.mkdir(parents=True)
-        (parent / ".block").write_text("{}")
-        file_path = to_posix_path(child / "test.txt")
 
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, _ = run_hook(input_json, cwd=str(child))
+def edit_json(file_path: Path) -> str:
+    """Create hook input JSON for an Edit of file_path."""
+    return make_edit_input(os.fspath(file_path))
 
-        assert "block" in output.lower(), f"Expected block from parent .block, got: {output}"
 
-    def test_detects_block_local_file(self, tmp_path):
-        """Hook should detect .block.local file."""
-        (tmp_path / ".block.local").write_text("{}")
-        file_path = to_posix_path(tmp_path / "test.txt")
+def write_json(file_path: Path) -> str:
+    """Create hook input JSON for a Write of file_path."""
+    return make_write_input(os.fspath(file_path))
 
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, _ = run_hook(input_json, cwd=str(tmp_path))
 
-        assert "block" in output.lower(), f"Expected block decision, got: {output}"
+def bash_touch_json(file_path: Path) -> str:
+    """Create hook input JSON for a Bash command touching file_path."""
+    return make_bash_input(f"touch {to_posix_path(file_path)}")
 
-    def test_allowed_pattern_permits_matching_file(self, tmp_path):
-        """Hook should allow files matching allowed patterns."""
-        (tmp_path / ".block").write_text('{"allowed": ["*.txt"]}')
-        file_path = to_posix_path(tmp_path / "test.txt")
 
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, _ = run_hook(input_json, cwd=str(tmp_path))
+# Directory layouts shared by the tests, built once per session by block_trees.
+# Each maps a path relative to the template root to its file content; None
+# creates an empty directory instead.
+BLOCK_TREE_LAYOUTS = {
+    "empty": {},
+    "blocked_root": {".block": "{}"},
+    "blocked_local": {".block.local": "{}"},
+    "allowed_txt": {".block": '{"allowed": ["*.txt"]}'},
+    "blocked_secret": {".block": '{"blocked": ["*.secret"]}'},
+    "nested_parent_block": {"parent/.block": "{}", "parent/child": None},
+    "block_in_subdir": {"subdir/.block": "{}"},
+    "deeply_nested": {"a/.block": "{}", "a/b/c": None},
+    "protected_sibling": {"protected/.block": "{}", "unprotected": None},
+    "snapshots_pattern": {"snapshots/.block": '{"blocked": ["*.verified.json"]}'},
+}
 
-        assert "block" not in output.lower(), f"Expected allow for *.txt pattern, got: {output}"
 
-    def test_allowed_pattern_blocks_non_matching_file(self, tmp_path):
-        """Hook should block files not matching allowed patterns."""
-        (tmp_path / ".block").write_text('{"allowed": ["*.txt"]}')
-        file_path = to_posix_path(tmp_path / "test.js")
+@pytest.fixture(scope="session")
+def block_trees(tmp_path_factory):
+    """Build every BLOCK_TREE_LAYOUTS template once and return {name: root}.
 
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, _ = run_hook(input_json, cwd=str(tmp_path))
+    The hook only reads these trees, so tests use them in place. Tests that
+    need to modify a layout should shutil.copytree() it into tmp_path first.
+    """
+    base = tmp_path_factory.mktemp("block_trees")
+    trees = {}
+    for name, layout in BLOCK_TREE_LAYOUTS.items():
+        root = base / name
+        root.mkdir()
+        for relative, content in layout.items():
+            path = root / relative
+            if content is None:
+                path.mkdir(parents=True, exist_ok=True)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(content)
+        trees[name] = root
+    return trees
+
+
+# Decision cases for the parametrized tests below. Every case list is laid out
+# as CASE_PARAMS: the block_trees template to run in; a builder that makes the
+# hook input from the target path (for HOOK_CMD_CASES, a --batch request line
+# from the target and cwd); the target and cwd, relative to the template root;
+# and whether the hook should block.
+CASE_PARAMS = "template, make_input, target, cwd, should_block"
+
+# Cases for TestRealExecutionPath.test_hook_cmd_batch
+HOOK_CMD_CASES = [
+    pytest.param("blocked_root", edit_request, "test.txt", ".", True, id="blocks"),
+    pytest.param("empty", edit_request, "test.txt", ".", False, id="allows"),
+    pytest.param(
+        "blocked_secret", edit_request, "api.secret", ".", True,
+        id="pattern_blocks_match",
+    ),
+    pytest.param(
+        "blocked_secret", edit_request, "readme.txt", ".", False,
+        id="pattern_allows_non_match",
+    ),
+    pytest.param(
+        "blocked_root", bash_redirect_request, "output.txt", ".", True,
+        id="bash_redirection",
+    ),
+    pytest.param(
+        "nested_parent_block", edit_request, "parent/child/test.txt", "parent/child", True,
+        id="hierarchical",
+    ),
+]
+
+
+# Cases for TestHookIntegration
+HOOK_CASES = [
+    pytest.param(
+        "blocked_root", edit_json, "test.txt", ".", True,
+        id="blocks_when_block_file_exists",
+    ),
+    pytest.param(
+        "empty", edit_json, "test.txt", ".", False,
+        id="allows_when_no_block_file",
+    ),
+    pytest.param(
+        "nested_parent_block", edit_json, "parent/child/test.txt", "parent/child", True,
+        id="detects_block_in_parent_directory",
+    ),
+    pytest.param(
+        "blocked_local", edit_json, "test.txt", ".", True,
+        id="detects_block_local_file",
+    ),
+    pytest.param(
+        "allowed_txt", edit_json, "test.txt", ".", False,
+        id="allowed_pattern_permits_matching_file",
+    ),
+    pytest.param(
+        "allowed_txt", edit_json, "test.js", ".", True,
+        id="allowed_pattern_blocks_non_matching_file",
+    ),
+]
+
+# Cases for TestWorkingDirectoryIndependence
+CWD_INDEPENDENCE_CASES = [
+    # The main scenario that was broken: cwd is the project root and the
+    # .block file is in a subdirectory. The old quick check would start at
+    # the root and walk UP, never finding the .block file in the subdirectory.
+    pytest.param(
+        "block_in_subdir", edit_json, "subdir/test.txt", ".", True,
+        id="blocks_when_cwd_is_parent_of_block_directory",
+    ),
+    pytest.param(
+        "deeply_nested", edit_json, "a/b/c/deep.txt", ".", True,
+        id="blocks_deeply_nested_file_when_cwd_is_root",
+    ),
+    pytest.param(
+        "protected_sibling", edit_json, "unprotected/test.txt", ".", False,
+        id="allows_when_block_only_in_sibling_directory",
+    ),
+    pytest.param(
+        "snapshots_pattern", edit_json, "snapshots/test.verified.json", ".", True,
+        id="blocks_with_pattern_when_cwd_is_parent",
+    ),
+    pytest.param(
+        "snapshots_pattern", edit_json, "snapshots/test.txt", ".", False,
+        id="allows_non_matching_pattern_when_cwd_is_parent",
+    ),
+    # The reverse scenario: running from a protected directory but targeting
+    # an absolute path in an unprotected directory
+    pytest.param(
+        "protected_sibling", edit_json, "unprotected/test.txt", "protected", False,
+        id="allows_unprotected_target_when_cwd_is_protected",
+    ),
+    pytest.param(
+        "protected_sibling", write_json, "protected/new_file.txt", ".", True,
+        id="write_tool_respects_cwd_independence",
+    ),
+    pytest.param(
+        "protected_sibling", bash_touch_json, "protected/file.txt", ".", True,
+        id="bash_tool_respects_cwd_independence",
+    ),
+]
+
+
+def check_hook_case(  # noqa: PLR0913, PLR0917
+    block_trees, monkeypatch, template, make_input, target, cwd, should_block
+):
+    """Evaluate one CASE_PARAMS case in-process via evaluate()."""
+    root = block_trees[template]
+    monkeypatch.chdir(root / cwd)
+
+    decision = _pd.evaluate(make_input(root / target))
+
+    if should_block:
+        assert decision is not None, "Expected block decision, got allow"
+        assert decision["decision"] == "block", f"Expected block decision, got: {decision}"
+    else:
+        assert decision is None, f"Expected allow (no block), got: {decision}"
 
-        assert "block" in output.lower(), f"Expected block for non-matching file, got: {output}"
+
+class TestHookIntegration:
+    """Test the protect_directories.py decision logic in-process via evaluate()."""
+
+    @pytest.mark.parametrize(CASE_PARAMS, HOOK_CASES)
+    def test_hook_decision(  # noqa: PLR0913, PLR0917
+        self, block_trees, monkeypatch, template, make_input, target, cwd, should_block
+    ):
+        """Hook should block or allow according to the .block files in the tree."""
+        check_hook_case(
+            block_trees, monkeypatch, template, make_input, target, cwd, should_block
+        )
 
 
 class TestWorkingDirectoryIndependence:
@@ -145,124 +341,64 @@ class TestWorkingDirectoryIndependence:
     working directory was set to the project root.
     """
 
-    def test_blocks_when_cwd_is_parent_of_block_directory(self, tmp_path):
-        """Hook should block when .block is in subdirectory and cwd is parent.
-
-        This is the main scenario that was broken:
-        - Project root: /project (cwd)
-        - .block file: /project/subdir/.block
-        - Target file: /project/subdir/file.txt
-
-        The old quick check would start at /project and walk UP,
-        never finding the .block file in the subdirectory.
-        """
-        subdir = tmp_path / "subdir"
-        subdir.mkdir()
-        (subdir / ".block").write_text("{}")
-        file_path = to_posix_path(subdir / "test.txt")
-
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        # Run with cwd set to PARENT (tmp_path), not the subdir
-        output, _ = run_hook(input_json, cwd=str(tmp_path))
-
-        assert "block" in output.lower(), f"Expected block when cwd is parent of .block dir, got: {output}"
-
-    def test_blocks_deeply_nested_file_when_cwd_is_root(self, tmp_path):
-        """Hook should block deeply nested files when cwd is project root."""
-        nested = tmp_path / "a" / "b" / "c"
-        nested.mkdir(parents=True)
-        (tmp_path / "a" / ".block").write_text("{}")
-        file_path = to_posix_path(nested / "deep.txt")
-
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, _ = run_hook(input_json, cwd=str(tmp_path))
-
-        assert "block" in output.lower(), f"Expected block for deeply nested file, got: {output}"
-
-    def test_allows_when_block_only_in_sibling_directory(self, tmp_path):
-        """Hook should allow when .block is only in a sibling directory."""
-        protected = tmp_path / "protected"
-        unprotected = tmp_path / "unprotected"
-        protected.mkdir()
-        unprotected.mkdir()
-        (protected / ".block").write_text("{}")
-        file_path = to_posix_path(unprotected / "test.txt")
-
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, exit_code = run_hook(input_json, cwd=str(tmp_path))
-
-        assert exit_code == 0, f"Expected exit 0, got {exit_code}"
-        assert "block" not in output.lower(), f"Expected allow for sibling dir, got: {output}"
-
-    def test_blocks_with_pattern_when_cwd_is_parent(self, tmp_path):
-        """Hook should correctly evaluate patterns when cwd is parent."""
-        subdir = tmp_path / "snapshots"
-        subdir.mkdir()
-        (subdir / ".block").write_text('{"blocked": ["*.verified.json"]}')
-        file_path = to_posix_path(subdir / "test.verified.json")
-
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, _ = run_hook(input_json, cwd=str(tmp_path))
-
-        assert "block" in output.lower(), f"Expected block for pattern match, got: {output}"
-
-    def test_allows_non_matching_pattern_when_cwd_is_parent(self, tmp_path):
-        """Hook should allow non-matching patterns when cwd is parent."""
-        subdir = tmp_path / "snapshots"
-        subdir.mkdir()
-        (subdir / ".block").write_text('{"blocked": ["*.verified.json"]}')
-        file_path = to_posix_path(subdir / "test.txt")
-
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, exit_code = run_hook(input_json, cwd=str(tmp_path))
-
-        assert exit_code == 0, f"Expected exit 0, got {exit_code}"
-        assert "block" not in output.lower(), f"Expected allow for non-matching pattern, got: {output}"
+    @pytest.mark.parametrize(CASE_PARAMS, CWD_INDEPENDENCE_CASES)
+    def test_decision_follows_target_not_cwd(  # noqa: PLR0913, PLR0917
+        self, block_trees, monkeypatch, template, make_input, target, cwd, should_block
+    ):
+        """Hook should evaluate protection from the target path, not the CWD."""
+        check_hook_case(
+            block_trees, monkeypatch, template, make_input, target, cwd, should_block
+        )
 
-    def test_allows_unprotected_target_when_cwd_is_protected(self, tmp_path):
-        """Hook should allow targeting unprotected files even when CWD is protected.
 
-        This tests the reverse scenario: running from a protected directory
-        but targeting an absolute path in an unprotected directory.
-        """
-        protected = tmp_path / "protected"
-        unprotected = tmp_path / "unprotected"
-        protected.mkdir()
-        unprotected.mkdir()
-        (protected / ".block").write_text("{}")
-        file_path = to_posix_path(unprotected / "test.txt")
+class TestBatchMode:
+    """Test protect_directories.py --batch, which answers one line per request."""
 
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, exit_code = run_hook(input_json, cwd=str(protected))
+    def test_bad_requests_fail_open_without_affecting_later_ones(self, block_trees):
+        """Each request gets a response; bad ones allow, and cwd never leaks."""
+        blocked = block_trees["blocked_root"]
+        relative_edit = json.loads(make_edit_input("test.txt"))
+        requests = [
+            {**relative_edit, "cwd": str(blocked / "missing")},
+            [1],
+            {**relative_edit, "cwd": str(blocked)},
+            relative_edit,
+        ]
+        lines = ["not json"] + [json.dumps(request) for request in requests]
 
-        assert exit_code == 0, f"Expected exit 0, got {exit_code}"
-        assert "block" not in output.lower(), (
-            f"Should NOT block unprotected target when CWD is protected, got: {output}"
+        result = subprocess.run(
+            [sys.executable, str(PROTECT_SCRIPT), "--batch"],
+            input="\n".join(lines) + "\n",
+            capture_output=True,
+            text=True,
+            cwd=str(block_trees["empty"]),
         )
+        responses = result.stdout.splitlines()
 
-    def test_write_tool_respects_cwd_independence(self, tmp_path):
-        """Write tool should block based on target path, not CWD."""
-        protected = tmp_path / "protected"
-        protected.mkdir()
-        (protected / ".block").write_text("{}")
-        file_path = to_posix_path(protected / "new_file.txt")
+        assert result.returncode == 0, f"Expected exit 0, got {result.returncode}: {result.stderr}"
+        assert len(responses) == len(lines), f"Expected one response per request, got: {responses}"
+        assert responses[:3] == ["", "", ""], f"Bad requests should be allowed, got: {responses}"
+        assert "block" in responses[3], f"Expected block from the request's cwd, got: {responses}"
+        # Without a cwd, the request runs from the batch process's starting directory
+        assert responses[4] == "", f"Expected allow from the starting cwd, got: {responses}"
 
-        input_json = f'{{"tool_name": "Write", "tool_input": {{"file_path": "{file_path}", "content": "test"}}}}'
-        output, _ = run_hook(input_json, cwd=str(tmp_path))
+    def test_hook_error_is_not_reported_as_allow(self, monkeypatch, capsys):
+        """A request whose evaluation raises gets an error line, not an allow."""
 
-        assert "block" in output.lower(), f"Write tool should be blocked, got: {output}"
+        def broken_evaluate(hook_input, data=None):
+            raise TypeError("simulated hook bug")
 
-    def test_bash_tool_respects_cwd_independence(self, tmp_path):
-        """Bash tool should block based on target path, not CWD."""
-        protected = tmp_path / "protected"
-        protected.mkdir()
-        (protected / ".block").write_text("{}")
-        file_path = to_posix_path(protected / "file.txt")
+        monkeypatch.setattr(_pd, "evaluate", broken_evaluate)
+        monkeypatch.setattr(sys, "stdin", io.StringIO(make_edit_input("test.txt") + "\n"))
 
-        input_json = f'{{"tool_name": "Bash", "tool_input": {{"command": "touch {file_path}"}}}}'
-        output, _ = run_hook(input_json, cwd=str(tmp_path))
+        _pd.run_batch()
+        captured = capsys.readouterr()
 
-        assert "block" in output.lower(), f"Bash tool should be blocked, got: {output}"
+        response = json.loads(captured.out)
+        assert response == {"error": "TypeError: simulated hook bug"}, (
+            f"Expected an error response, got: {captured.out!r}"
+        )
+        assert "Traceback" in captured.err, f"Expected a traceback on stderr: {captured.err!r}"
 
 
 class TestRealExecutionPath:
@@ -276,94 +412,69 @@ class TestRealExecutionPath:
     - Cross-platform compatibility
 
     This would have caught the permission bug that was fixed in v1.1.12.
+
+    Decision cases share one run-hook.cmd --batch child; test_blocks_via_hook_cmd
+    and test_allows_via_hook_cmd keep one-shot runs of the exact invocation
+    Claude Code uses. On Windows, where .cmd file association makes the
+    permission bug unreachable, only those smoke tests and the executable
+    check run.
     """
 
     def test_hook_script_is_executable(self):
         """Verify run-hook.cmd has execute permissions (critical for Unix/Mac)."""
-        import os
-        import stat
-
-        mode = os.stat(RUN_HOOK_CMD).st_mode
-        is_executable = bool(mode & stat.S_IXUSR)
-
-        assert is_executable, (
-            f"{RUN_HOOK_CMD} is not executable (mode: {oct(mode)}). "
+        assert _EXEC_MODE & stat.S_IXUSR, (
+            f"{RUN_HOOK_CMD} is not executable (mode: {oct(_EXEC_MODE)}). "
             f"Run: chmod +x {RUN_HOOK_CMD}"
         )
 
-    def test_blocks_via_hook_cmd(self, tmp_path):
+    def test_blocks_via_hook_cmd(self, block_trees):
         """Test blocking via run-hook.cmd (real Claude Code execution path)."""
-        (tmp_path / ".block").write_text("{}")
-        file_path = to_posix_path(tmp_path / "test.txt")
+        root = block_trees["blocked_root"]
 
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, exit_code = run_hook_cmd(input_json, cwd=str(tmp_path))
+        input_json = edit_json(root / "test.txt")
+        output, exit_code = run_hook_cmd(input_json, cwd=str(root))
 
         assert exit_code == 0, f"Hook should exit 0 even when blocking, got: {exit_code}"
-        assert "block" in output.lower(), f"Expected block decision via hook cmd, got: {output}"
+        assert b"block" in output.lower(), f"Expected block decision via hook cmd, got: {output}"
 
-    def test_allows_via_hook_cmd(self, tmp_path):
+    def test_allows_via_hook_cmd(self, block_trees):
         """Test allowing via run-hook.cmd (no .block file)."""
-        file_path = to_posix_path(tmp_path / "test.txt")
+        root = block_trees["empty"]
 
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, exit_code = run_hook_cmd(input_json, cwd=str(tmp_path))
+        input_json = edit_json(root / "test.txt")
+        output, exit_code = run_hook_cmd(input_json, cwd=str(root))
 
         assert exit_code == 0, f"Expected exit 0, got {exit_code}"
-        assert "block" not in output.lower(), f"Expected allow (no block), got: {output}"
-
-    def test_pattern_matching_via_hook_cmd(self, tmp_path):
-        """Test pattern matching via run-hook.cmd."""
-        (tmp_path / ".block").write_text('{"blocked": ["*.secret"]}')
-        secret_file = to_posix_path(tmp_path / "api.secret")
-        safe_file = to_posix_path(tmp_path / "readme.txt")
-
-        # Should block .secret file
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{secret_file}"}}}}'
-        output, _ = run_hook_cmd(input_json, cwd=str(tmp_path))
-        assert "block" in output.lower(), f"Expected block for *.secret, got: {output}"
-
-        # Should allow other files
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{safe_file}"}}}}'
-        output, _ = run_hook_cmd(input_json, cwd=str(tmp_path))
-        assert "block" not in output.lower(), f"Expected allow for .txt, got: {output}"
+        assert b"block" not in output.lower(), f"Expected allow (no block), got: {output}"
 
-    def test_bash_command_detection_via_hook_cmd(self, tmp_path):
-        """Test Bash command path extraction via run-hook.cmd."""
-        (tmp_path / ".block").write_text("{}")
-        file_path = to_posix_path(tmp_path / "output.txt")
-
-        # Test output redirection detection
-        input_json = f'{{"tool_name": "Bash", "tool_input": {{"command": "echo test > {file_path}"}}}}'
-        output, _ = run_hook_cmd(input_json, cwd=str(tmp_path))
-
-        assert "block" in output.lower(), f"Expected block for bash redirection, got: {output}"
-
-    def test_python_fallback_message_via_hook_cmd(self, tmp_path, monkeypatch):
+    @pytest.mark.skipif(
+        _IS_WINDOWS,
+        reason="run-hook.cmd exec-bit bug class is Unix-only; direct-path tests cover Windows",
+    )
+    # One worker runs every case, so the class-scoped child is started only once
+    @pytest.mark.xdist_group("hook_cmd_batch")
+    @pytest.mark.parametrize(CASE_PARAMS, HOOK_CMD_CASES)
+    def test_hook_cmd_batch(  # noqa: PLR0913, PLR0917
+        self, block_trees, persistent_hook_cmd, template, make_input, target, cwd, should_block
+    ):
+        """Test protection decisions via one persistent run-hook.cmd --batch child."""
+        root = block_trees[template]
+
+        request = make_input(root / target, root / cwd)
+        output = send_hook_cmd(persistent_hook_cmd, request)
+
+        if should_block:
+            assert b"block" in output.lower(), f"Expected block decision via hook cmd, got: {output}"
+        else:
+            assert b"block" not in output.lower(), f"Expected allow via hook cmd, got: {output}"
+
+    @pytest.mark.skip(
+        reason="Difficult to test Python fallback without breaking test runner: "
+        "hiding python from PATH would also break pytest",
+    )
+    def test_python_fallback_message_via_hook_cmd(self):
         """Test Python not found fallback message via run-hook.cmd.
 
-        Note: This test is platform-dependent and may be skipped if
-        it interferes with the actual Python detection in run-hook.cmd.
+        Expected behavior: hook should output JSON with Python requirement
+        message if python3/python not found in PATH.
         """
-        # This test is difficult to implement without breaking the hook
-        # We'd need to modify PATH to hide Python, which could break pytest
-        # Skip this test for now, but document the expected behavior
-        import pytest
-        pytest.skip(
-            "Difficult to test Python fallback without breaking test runner. "
-            "Expected behavior: hook should output JSON with Python requirement message "
-            "if python3/python not found in PATH."
-        )
-
-    def test_hierarchical_protection_via_hook_cmd(self, tmp_path):
-        """Test directory hierarchy traversal via run-hook.cmd."""
-        parent = tmp_path / "parent"
-        child = parent / "child"
-        child.mkdir(parents=True)
-        (parent / ".block").write_text("{}")
-        file_path = to_posix_path(child / "test.txt")
-
-        input_json = f'{{"tool_name": "Edit", "tool_input": {{"file_path": "{file_path}"}}}}'
-        output, _ = run_hook_cmd(input_json, cwd=str(child))
-
-        assert "block" in output.lower(), f"Expected block from parent .block, got: {output}"